@@ -1,22 +1,29 @@
 # app.py - Aplicación Streamlit para extraer datos de PDFs de caja
 
 import streamlit as st
-import pdfplumber
 import pandas as pd
-import re
-import io
+import os
+import hashlib
 from datetime import datetime
-import base64
+import csv
+import io
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
-# Configuración de la página
-st.set_page_config(
-    page_title="Extractor de Datos - Informes de Caja",
-    page_icon="💰",
-    layout="wide"
-)
+from extraccion import procesar_pdf_bytes
+
+# Columnas de la tabla de resultados y del CSV, en orden
+_COLUMNAS_ORDEN = ['Archivo', 'Apertura', 'Cierre', 'V_Bruta', 'Total', 
+                   'Efectivo', 'Datafono', 'Total_Egresos', 'Diferencia']
+
+# Máximo de PDFs cuyos resultados se conservan en memoria
+_MAX_PDFS_EN_CACHE = 256
 
 # CSS personalizado para mejor apariencia
-st.markdown("""
+_CSS = """
     <style>
     .main {
         padding-top: 2rem;
@@ -51,101 +58,82 @@ st.markdown("""
         margin: 1rem 0;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+# Configuración de la página
+st.set_page_config(
+    page_title="Extractor de Datos - Informes de Caja",
+    page_icon="💰",
+    layout="wide"
+)
+
+@st.cache_resource
+def _inyectar_css():
+    """Inyecta el CSS; Streamlit reproduce el elemento cacheado en cada ejecución"""
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+_inyectar_css()
 
 # Título y descripción
 st.title("💰 Extractor de Datos - Informes de Caja")
 st.markdown("### Sube tus archivos PDF de informes diarios para extraer los datos automáticamente")
 
-# Funciones de extracción (las mismas del script anterior)
-def limpiar_valor_monetario(valor):
-    """Limpia valores monetarios removiendo $ y comas"""
-    if valor:
-        return valor.replace('$', '').replace(',', '').strip()
-    return '0'
-
-def extraer_datos_pdf(contenido_texto):
-    """Extrae los campos específicos del contenido del PDF"""
+@st.cache_resource
+def _cache_resultados():
+    """Resultados ya extraídos, por SHA-1 del contenido del PDF, y el lock que lo protege
     
-    datos = {
-        'Apertura': '',
-        'Cierre': '',
-        'V_Bruta': 0,
-        'Total': 0,
-        'Efectivo': 0,
-        'Datafono': 0,
-        'Total_Egresos': 0,
-        'Diferencia': 0
-    }
+    Es compartido por todas las sesiones, y cada una ejecuta el script en su
+    propio hilo: cualquier lectura o escritura debe hacerse con el lock tomado.
+    """
+    return OrderedDict(), threading.Lock()
+
+@st.cache_resource
+def _executor():
+    """Pool de procesos de trabajo, compartido por todas las sesiones y ejecuciones
     
-    try:
-        # Extraer Apertura (A:)
-        patron_apertura = r'A:\s*(\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2}\s+[AP]M)'
-        match_apertura = re.search(patron_apertura, contenido_texto)
-        if match_apertura:
-            datos['Apertura'] = match_apertura.group(1)
-        
-        # Extraer Cierre (C:)
-        patron_cierre = r'C:\s*(\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2}\s+[AP]M)'
-        match_cierre = re.search(patron_cierre, contenido_texto)
-        if match_cierre:
-            datos['Cierre'] = match_cierre.group(1)
-        
-        # Extraer V. Bruta y Total
-        patron_seccion_facturas = r'DATOS DE FACTURAS[\s\S]*?V\.\s*Bruta\s*:\s*\$?([\d,]+)[\s\S]*?Total\s*:\s*\$?([\d,]+)'
-        match_facturas = re.search(patron_seccion_facturas, contenido_texto)
-        if match_facturas:
-            datos['V_Bruta'] = int(limpiar_valor_monetario(match_facturas.group(1)))
-            datos['Total'] = int(limpiar_valor_monetario(match_facturas.group(2)))
-        
-        # Extraer Efectivo
-        patron_efectivo = r'Medio\s*:\s*EFECTIVO[\s\S]*?Val\.\s*Ventas\s*:\s*\$?([\d,]+)'
-        match_efectivo = re.search(patron_efectivo, contenido_texto)
-        if match_efectivo:
-            datos['Efectivo'] = int(limpiar_valor_monetario(match_efectivo.group(1)))
-        
-        # Extraer Datafono
-        patron_datafono = r'Medio\s*:\s*DATAFONO[\s\S]*?Val\.\s*Ventas\s*:\s*\$?([\d,]+)'
-        match_datafono = re.search(patron_datafono, contenido_texto)
-        if match_datafono:
-            datos['Datafono'] = int(limpiar_valor_monetario(match_datafono.group(1)))
-        
-        # Extraer Total de Egresos
-        patron_egresos = r'DETALLE DE EGRESOS[\s\S]*?Total\s*:\s*\$?([\d,]+)'
-        match_egresos = re.search(patron_egresos, contenido_texto)
-        if match_egresos:
-            datos['Total_Egresos'] = int(limpiar_valor_monetario(match_egresos.group(1)))
-        
-        # Extraer Diferencia
-        patron_diferencia = r'Diferencia:\s*\$?([\d,]+)'
-        match_diferencia = re.search(patron_diferencia, contenido_texto)
-        if match_diferencia:
-            datos['Diferencia'] = int(limpiar_valor_monetario(match_diferencia.group(1)))
-            
-    except Exception as e:
-        st.error(f"Error al extraer datos: {e}")
+    Se crea en el primer procesamiento y los procesos arrancan a demanda: solo
+    se crean tantos como PDFs haya en curso a la vez, hasta os.cpu_count(), y
+    se reutilizan en los siguientes clics.
     
-    return datos
+    Los procesos se crean con fork. Con spawn o forkserver cada proceso nuevo
+    vuelve a ejecutar el módulo __main__, que bajo Streamlit es este script.
+    Donde no hay fork (Windows) se usan hilos.
+    """
+    max_workers = os.cpu_count() or 1
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=multiprocessing.get_context("fork"))
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+def _descartar_executor(executor):
+    """Descarta un pool roto (un proceso de trabajo terminó de forma anómala)"""
+    if _executor() is executor:
+        _executor.clear()
+    executor.shutdown(wait=False, cancel_futures=True)
 
-def procesar_pdf(archivo_pdf):
-    """Procesa un archivo PDF y extrae los datos"""
+def _enviar_pdfs(contenidos, indices):
+    """Envía al pool los PDFs indicados; devuelve el pool y {futuro: índice}"""
+    executor = _executor()
     try:
-        texto_completo = ""
-        with pdfplumber.open(archivo_pdf) as pdf:
-            for pagina in pdf.pages:
-                texto_completo += pagina.extract_text() + "\n"
-        
-        return extraer_datos_pdf(texto_completo)
-    except Exception as e:
-        st.error(f"Error al procesar PDF: {e}")
-        return None
+        futuros = {executor.submit(procesar_pdf_bytes, contenidos[idx]): idx for idx in indices}
+    except BrokenProcessPool:
+        # El pool ya no acepta tareas: se descarta y se reintenta con uno nuevo
+        _descartar_executor(executor)
+        executor = _executor()
+        futuros = {executor.submit(procesar_pdf_bytes, contenidos[idx]): idx for idx in indices}
+    return executor, futuros
+
+def _generar_csv(resultados):
+    """Genera el CSV de descarga (bytes UTF-8) a partir de los resultados"""
+    buffer_csv = io.StringIO()
+    writer = csv.DictWriter(buffer_csv, fieldnames=_COLUMNAS_ORDEN, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(resultados)
+    return buffer_csv.getvalue().encode('utf-8')
 
-def get_download_link(df):
-    """Genera un link de descarga para el DataFrame"""
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    fecha_hora = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f'<a href="data:file/csv;base64,{b64}" download="datos_caja_{fecha_hora}.csv" class="download-button">📥 Descargar archivo CSV</a>'
+def _descartar_resultados():
+    """Olvida los resultados mostrados cuando cambian los archivos subidos"""
+    st.session_state.pop('proceso', None)
 
 # Interfaz principal
 col1, col2 = st.columns([2, 1])
@@ -156,7 +144,8 @@ with col1:
         "Arrastra o selecciona archivos PDF",
         type=['pdf'],
         accept_multiple_files=True,
-        help="Puedes seleccionar múltiples archivos PDF a la vez"
+        help="Puedes seleccionar múltiples archivos PDF a la vez",
+        on_change=_descartar_resultados
     )
 
 with col2:
@@ -187,16 +176,48 @@ if uploaded_files:
         resultados = []
         errores = []
         
-        # Procesar cada archivo
-        for idx, uploaded_file in enumerate(uploaded_files):
-            # Actualizar progreso
-            progress = (idx + 1) / len(uploaded_files)
-            progress_bar.progress(progress)
-            status_text.text(f"Procesando {idx + 1} de {len(uploaded_files)}: {uploaded_file.name}")
-            
-            # Extraer datos
-            datos = procesar_pdf(uploaded_file)
-            
+        # Reutilizar los resultados de PDFs ya procesados (mismo contenido)
+        cache, lock_cache = _cache_resultados()
+        contenidos = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
+        claves = [hashlib.sha1(contenido).hexdigest() for contenido in contenidos]
+        with lock_cache:
+            datos_por_archivo = [
+                dict(cache[clave]) if clave in cache else None for clave in claves
+            ]
+        pendientes = [idx for idx, datos in enumerate(datos_por_archivo) if datos is None]
+        
+        # Procesar los archivos restantes en paralelo, un PDF por proceso
+        if pendientes:
+            executor, futuros = _enviar_pdfs(contenidos, pendientes)
+            ya_procesados = len(uploaded_files) - len(pendientes)
+            for completados, futuro in enumerate(as_completed(futuros), start=ya_procesados + 1):
+                idx = futuros[futuro]
+                nombre = uploaded_files[idx].name
+                
+                # Actualizar progreso
+                progress_bar.progress(completados / len(uploaded_files))
+                status_text.text(f"Procesado {completados} de {len(uploaded_files)}: {nombre}")
+                
+                try:
+                    datos = futuro.result()
+                except BrokenProcessPool as e:
+                    # El resto de PDFs del lote fallará igual; el siguiente clic
+                    # usará un pool nuevo
+                    st.error(f"Error al procesar PDF {nombre}: {e}")
+                    _descartar_executor(executor)
+                    continue
+                except Exception as e:
+                    st.error(f"Error al procesar PDF {nombre}: {e}")
+                    continue
+                
+                with lock_cache:
+                    cache[claves[idx]] = datos
+                    if len(cache) > _MAX_PDFS_EN_CACHE:
+                        cache.popitem(last=False)
+                datos_por_archivo[idx] = dict(datos)
+        
+        # Conservar el orden en que se subieron los archivos
+        for uploaded_file, datos in zip(uploaded_files, datos_por_archivo):
             if datos:
                 datos['Archivo'] = uploaded_file.name
                 resultados.append(datos)
@@ -207,21 +228,35 @@ if uploaded_files:
         progress_bar.empty()
         status_text.empty()
         
-        # Mostrar resultados
+        # Guardar los resultados, y el CSV ya generado, para que sigan
+        # disponibles en las siguientes ejecuciones del script (p. ej. al
+        # pulsar el botón de descarga) sin volver a serializarlos
+        st.session_state['proceso'] = {
+            'resultados': resultados,
+            'errores': errores,
+            'total_archivos': len(uploaded_files),
+            'csv': _generar_csv(resultados),
+            'nombre_csv': f"datos_caja_{datetime.now():%Y%m%d_%H%M%S}.csv",
+        }
+    
+    # Mostrar resultados
+    proceso = st.session_state.get('proceso')
+    if proceso:
+        resultados = proceso['resultados']
+        errores = proceso['errores']
+        
         if resultados:
-            # Crear DataFrame
-            df = pd.DataFrame(resultados)
-            
-            # Reordenar columnas
-            columnas_orden = ['Archivo', 'Apertura', 'Cierre', 'V_Bruta', 'Total', 
-                            'Efectivo', 'Datafono', 'Total_Egresos', 'Diferencia']
-            df = df[columnas_orden]
+            # Crear DataFrame con las columnas ya ordenadas y los importes como int64
+            columnas_numericas = ['V_Bruta', 'Total', 'Efectivo', 'Datafono',
+                                  'Total_Egresos', 'Diferencia']
+            df = pd.DataFrame.from_records(resultados, columns=_COLUMNAS_ORDEN)
+            df = df.astype({columna: 'int64' for columna in columnas_numericas})
             
             # Mensaje de éxito
             st.markdown(f"""
                 <div class="success-message">
                     ✅ <strong>¡Proceso completado!</strong><br>
-                    Se procesaron exitosamente {len(resultados)} de {len(uploaded_files)} archivos.
+                    Se procesaron exitosamente {len(resultados)} de {proceso['total_archivos']} archivos.
                 </div>
             """, unsafe_allow_html=True)
             
@@ -245,20 +280,28 @@ if uploaded_files:
                 }
             )
             
-            # Estadísticas rápidas
+            # Estadísticas rápidas (una sola reducción sobre las cuatro columnas)
+            v_bruta, efectivo, datafono, egresos = df[
+                ['V_Bruta', 'Efectivo', 'Datafono', 'Total_Egresos']
+            ].to_numpy().sum(axis=0).tolist()
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Total Ventas Brutas", f"${df['V_Bruta'].sum():,}")
+                st.metric("Total Ventas Brutas", f"${v_bruta:,}")
             with col2:
-                st.metric("Total Efectivo", f"${df['Efectivo'].sum():,}")
+                st.metric("Total Efectivo", f"${efectivo:,}")
             with col3:
-                st.metric("Total Datafono", f"${df['Datafono'].sum():,}")
+                st.metric("Total Datafono", f"${datafono:,}")
             with col4:
-                st.metric("Total Egresos", f"${df['Total_Egresos'].sum():,}")
+                st.metric("Total Egresos", f"${egresos:,}")
             
             # Botón de descarga
             st.markdown("### 💾 Descargar resultados")
-            st.markdown(get_download_link(df), unsafe_allow_html=True)
+            st.download_button(
+                "📥 Descargar archivo CSV",
+                data=proceso['csv'],
+                file_name=proceso['nombre_csv'],
+                mime="text/csv"
+            )
             
         else:
             st.markdown("""
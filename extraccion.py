@@ -0,0 +1,189 @@
+# extraccion.py - Extracción de datos de los PDFs de informes de caja
+#
+# Vive fuera de app.py para que los procesos de trabajo puedan importar
+# estas funciones sin ejecutar la interfaz de Streamlit.
+
+import re
+import io
+import hashlib
+
+try:
+    import fitz  # PyMuPDF: extrae solo el texto, sin construir objetos de layout
+except ImportError:
+    fitz = None
+    import pdfplumber
+
+# Patrón único con todos los campos y encabezados de sección, de modo que el
+# texto se recorra una sola vez. Cada alternativa tiene un único grupo con
+# nombre, que identifica qué se encontró (match.lastgroup). Las reglas que
+# asignan cada valor a su campo están en _actualizar_datos.
+_PAT_CAMPOS = re.compile(
+    r'A:\s*(?P<apertura>\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2}\s+[AP]M)'
+    r'|C:\s*(?P<cierre>\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2}\s+[AP]M)'
+    r'|V\.\s*Bruta\s*:\s*\$?(?P<v_bruta>,*\d[\d,]*)'
+    r'|Val\.\s*Ventas\s*:\s*\$?(?P<val_ventas>,*\d[\d,]*)'
+    r'|Total\s*:\s*\$?(?P<total>,*\d[\d,]*)'
+    r'|Diferencia:\s*\$?(?P<diferencia>,*\d[\d,]*)'
+    r'|(?P<facturas>DATOS DE FACTURAS)'
+    r'|(?P<egresos>DETALLE DE EGRESOS)'
+    r'|Medio\s*:\s*(?P<medio>EFECTIVO|DATAFONO)',
+    re.ASCII  # fechas, horas e importes son ASCII: \d es [0-9] y \s solo espacios ASCII
+)
+
+# Literales con los que empieza cada alternativa de _PAT_CAMPOS
+_ANCLAS_CAMPOS = ('A:', 'C:', 'V.', 'Val.', 'Total', 'Diferencia:',
+                  'DATOS DE FACTURAS', 'DETALLE DE EGRESOS', 'Medio')
+
+# Caracteres del final de una página que se conservan para la siguiente; basta
+# con que quepa una etiqueta con su valor (p. ej. "V. Bruta : $1,234,567")
+_LARGO_COLA = 80
+
+# Tabla para quitar $ y comas de un valor monetario en una sola pasada; los
+# valores capturados siempre tienen algún dígito, así que int() no falla
+_TABLA_MONEDA = str.maketrans('', '', '$,')
+
+def _inicio_campos(contenido_texto):
+    """Posición de la primera ancla de _ANCLAS_CAMPOS en el texto, o -1 si no hay"""
+    posiciones = [pos for pos in map(contenido_texto.find, _ANCLAS_CAMPOS) if pos >= 0]
+    return min(posiciones) if posiciones else -1
+
+def _datos_vacios():
+    """Valores por defecto de los campos que se extraen"""
+    return {
+        'Apertura': '',
+        'Cierre': '',
+        'V_Bruta': 0,
+        'Total': 0,
+        'Efectivo': 0,
+        'Datafono': 0,
+        'Total_Egresos': 0,
+        'Diferencia': 0
+    }
+
+def _estado_inicial():
+    """Estado del recorrido, que se conserva de una página a la siguiente"""
+    return {'encontrados': set(), 'encabezados': set(), 'v_bruta': None, 'cola': ''}
+
+def _actualizar_datos(datos, contenido_texto, estado):
+    """Completa `datos` con el texto dado; devuelve True si ya están todos los campos
+    
+    Cada valor de sección es el primero que aparece después del primer
+    encabezado de su tipo, aunque entre ambos haya encabezados de otras
+    secciones (igual que las búsquedas `ENCABEZADO[\\s\\S]*?valor`):
+    
+    - V. Bruta: el primero tras DATOS DE FACTURAS; Total: el primero tras ese V. Bruta.
+    - Efectivo / Datafono: el primer Val. Ventas tras su línea "Medio : ...".
+    - Total Egresos: el primer Total tras DETALLE DE EGRESOS.
+    
+    Un mismo valor puede servir a varias secciones. Apertura, Cierre y
+    Diferencia son su primera aparición en el documento.
+    """
+    
+    encontrados = estado['encontrados']
+    encabezados = estado['encabezados']
+    v_bruta = estado['v_bruta']
+    
+    # El final sin coincidencias de la página anterior va delante, para que una
+    # etiqueta y su valor separados por el salto de página sigan coincidiendo
+    contenido_texto = estado['cola'] + contenido_texto
+    fin_ultimo_match = 0
+    
+    # Sin ninguna ancla no puede haber coincidencias: se evita recorrer el texto
+    # con la expresión regular, y si la hay, el recorrido empieza en ella
+    inicio = _inicio_campos(contenido_texto)
+    matches = _PAT_CAMPOS.finditer(contenido_texto, inicio) if inicio >= 0 else ()
+    
+    for match in matches:
+        fin_ultimo_match = match.end()
+        campo = match.lastgroup
+        valor = match.group(campo)
+        
+        # Encabezados: habilitan los valores de su sección que vengan después
+        if campo in ('facturas', 'egresos'):
+            encabezados.add(campo)
+        elif campo == 'medio':
+            encabezados.add(valor.lower())
+        
+        # Apertura (A:) y Cierre (C:)
+        elif campo in ('apertura', 'cierre'):
+            clave = campo.capitalize()
+            if clave not in encontrados:
+                datos[clave] = valor
+                encontrados.add(clave)
+        
+        # V. Bruta de DATOS DE FACTURAS; se guarda hasta encontrar su Total
+        elif campo == 'v_bruta':
+            if 'facturas' in encabezados and v_bruta is None:
+                v_bruta = valor
+        
+        # Total: cierra DATOS DE FACTURAS (tras V. Bruta) y/o DETALLE DE EGRESOS
+        elif campo == 'total':
+            if v_bruta is not None and 'Total' not in encontrados:
+                datos['V_Bruta'] = int(v_bruta.translate(_TABLA_MONEDA))
+                datos['Total'] = int(valor.translate(_TABLA_MONEDA))
+                encontrados.update(('V_Bruta', 'Total'))
+            if 'egresos' in encabezados and 'Total_Egresos' not in encontrados:
+                datos['Total_Egresos'] = int(valor.translate(_TABLA_MONEDA))
+                encontrados.add('Total_Egresos')
+        
+        # Efectivo y Datafono (Val. Ventas de cada medio de pago)
+        elif campo == 'val_ventas':
+            for medio in ('efectivo', 'datafono'):
+                clave = medio.capitalize()
+                if medio in encabezados and clave not in encontrados:
+                    datos[clave] = int(valor.translate(_TABLA_MONEDA))
+                    encontrados.add(clave)
+        
+        # Diferencia
+        elif campo == 'diferencia':
+            if 'Diferencia' not in encontrados:
+                datos['Diferencia'] = int(valor.translate(_TABLA_MONEDA))
+                encontrados.add('Diferencia')
+    
+    # Tras la última coincidencia solo puede quedar el comienzo de otra; las
+    # páginas se separan con "\n", como al unir el texto del documento completo
+    corte = max(fin_ultimo_match, len(contenido_texto) - _LARGO_COLA)
+    estado['cola'] = contenido_texto[corte:] + "\n"
+    estado['v_bruta'] = v_bruta
+    return len(encontrados) == len(datos)
+
+def extraer_datos_paginas(paginas):
+    """Extrae los campos del texto de las páginas de un PDF, en orden
+    
+    `paginas` puede ser un generador: deja de consumirse en cuanto se han
+    encontrado todos los campos, así que las páginas restantes no se leen.
+    """
+    datos = _datos_vacios()
+    estado = _estado_inicial()
+    for texto_pagina in paginas:
+        if _actualizar_datos(datos, texto_pagina, estado):
+            break
+    return datos
+
+def procesar_pdf(archivo_pdf):
+    """Procesa un archivo PDF y extrae los datos (los errores se propagan)"""
+    if fitz is not None:
+        with fitz.open(stream=archivo_pdf.read(), filetype='pdf') as doc:
+            return extraer_datos_paginas(pagina.get_text("text") for pagina in doc)
+    with pdfplumber.open(archivo_pdf) as pdf:
+        return extraer_datos_paginas(pagina.extract_text() or "" for pagina in pdf.pages)
+
+def procesar_pdf_bytes(data):
+    """Procesa un PDF recibido como bytes; usable desde procesos de trabajo"""
+    return procesar_pdf(io.BytesIO(data))
+
+def _hash_fuente():
+    """Hash de este archivo, para reconocer una extensión compilada de otra versión"""
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+# Versión compilada opcional (tools/compilar_cython.py). Sus funciones sustituyen
+# a las de arriba solo si se compiló a partir de este mismo archivo; si falta o
+# quedó desactualizada tras editarlo, se sigue usando el Python puro.
+if __name__ != '_extraccion_c':
+    try:
+        import _extraccion_c
+    except ImportError:
+        _extraccion_c = None
+    if _extraccion_c is not None and getattr(_extraccion_c, '_HASH_FUENTE', None) == _hash_fuente():
+        from _extraccion_c import extraer_datos_paginas, procesar_pdf, procesar_pdf_bytes
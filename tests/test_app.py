@@ -0,0 +1,95 @@
+# tests/test_app.py - Prueba de la aplicación completa con streamlit.testing
+
+import os
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest
+
+from test_extraccion import DATOS_INFORME, INFORME
+
+
+def _pdf_con_texto(lineas):
+    """Genera un PDF de una página con las líneas de texto dadas"""
+    contenido = "BT /F1 10 Tf 12 TL 40 800 Td\n"
+    for linea in lineas:
+        texto = linea.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        contenido += f"({texto}) Tj T*\n"
+    contenido += "ET"
+    objetos = [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        b"<</Type/Pages/Kids[3 0 R]/Count 1>>",
+        b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]"
+        b"/Resources<</Font<</F1 4 0 R>>>>/Contents 5 0 R>>",
+        b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>",
+        b"<</Length %d>>\nstream\n%s\nendstream" % (len(contenido), contenido.encode("latin-1")),
+    ]
+    pdf = b"%PDF-1.4\n"
+    posiciones = []
+    for numero, objeto in enumerate(objetos, start=1):
+        posiciones.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (numero, objeto)
+    inicio_xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % posicion for posicion in posiciones)
+    pdf += b"trailer\n<</Size %d/Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objetos) + 1, inicio_xref)
+    return pdf
+
+
+def _archivo_subido(nombre, contenido):
+    return SimpleNamespace(name=nombre, getvalue=lambda: contenido)
+
+
+def test_procesar_pdfs_desde_la_interfaz():
+    informe_2 = INFORME.replace("$3,500", "$1,500")
+    archivos = [
+        _archivo_subido("informe_1.pdf", _pdf_con_texto(INFORME.splitlines())),
+        _archivo_subido("informe_2.pdf", _pdf_con_texto(informe_2.splitlines())),
+        _archivo_subido("roto.pdf", b"esto no es un PDF"),
+    ]
+
+    # AppTest no permite subir archivos: se sustituye st.file_uploader
+    with mock.patch("streamlit.file_uploader", return_value=archivos):
+        at = AppTest.from_file("../app.py", default_timeout=60)
+        at.run()
+        at.button[0].click().run()
+
+    assert not at.exception
+    proceso = at.session_state["proceso"]
+    assert [datos["Archivo"] for datos in proceso["resultados"]] == ["informe_1.pdf", "informe_2.pdf"]
+    assert proceso["errores"] == ["roto.pdf"]
+    for datos in proceso["resultados"]:
+        esperado = dict(DATOS_INFORME, Archivo=datos["Archivo"])
+        if datos["Archivo"] == "informe_2.pdf":
+            esperado["Diferencia"] = 1500
+        assert datos == esperado
+    assert at.metric[0].value == f"${2 * DATOS_INFORME['V_Bruta']:,}"
+
+
+def _terminar_proceso(data):
+    """Sustituto de procesar_pdf_bytes que mata al proceso de trabajo"""
+    os._exit(1)
+
+
+def test_proceso_de_trabajo_caido_no_deja_el_pool_roto():
+    informe = INFORME.replace("$3,500", "$2,500")
+    archivos = [_archivo_subido("informe.pdf", _pdf_con_texto(informe.splitlines()))]
+
+    with mock.patch("streamlit.file_uploader", return_value=archivos):
+        at = AppTest.from_file("../app.py", default_timeout=60)
+        with mock.patch("extraccion.procesar_pdf_bytes", _terminar_proceso):
+            at.run()
+            at.button[0].click().run()
+        assert not at.exception
+        assert at.session_state["proceso"]["errores"] == ["informe.pdf"]
+
+        # El siguiente clic debe usar un pool nuevo
+        at.button[0].click().run()
+
+    assert not at.exception
+    assert at.session_state["proceso"]["errores"] == []
+    assert at.session_state["proceso"]["resultados"][0]["Diferencia"] == 2500
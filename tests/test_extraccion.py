@@ -0,0 +1,96 @@
+# tests/test_extraccion.py - Regresiones de la extracción de campos
+
+from extraccion import extraer_datos_paginas
+
+# Texto representativo de un COMPROBANTE INFORME DIARIO de CONEXION POS
+INFORME = """COMPROBANTE INFORME DIARIO
+CONEXION POS
+A: 01/03/2024 07:01:22 AM C: 01/03/2024 09:15:03 PM
+DATOS DE FACTURAS
+Fact. Inicial: 100 Fact. Final: 180
+V. Bruta : $1,250,000
+Descuentos : $0
+Total : $1,200,000
+MEDIOS DE PAGO
+Medio : EFECTIVO
+Cant. : 40
+Val. Ventas : $800,000
+Medio : DATAFONO
+Cant. : 20
+Val. Ventas : $400,000
+DETALLE DE EGRESOS
+Proveedor 1 $20,000
+Total : $50,000
+Diferencia: $3,500
+"""
+
+DATOS_INFORME = {
+    'Apertura': '01/03/2024 07:01:22 AM',
+    'Cierre': '01/03/2024 09:15:03 PM',
+    'V_Bruta': 1250000,
+    'Total': 1200000,
+    'Efectivo': 800000,
+    'Datafono': 400000,
+    'Total_Egresos': 50000,
+    'Diferencia': 3500,
+}
+
+
+def test_informe_representativo():
+    assert extraer_datos_paginas([INFORME]) == DATOS_INFORME
+
+
+def test_texto_sin_campos():
+    datos = extraer_datos_paginas([''])
+    assert datos['Apertura'] == '' and datos['Cierre'] == ''
+    assert all(datos[campo] == 0 for campo in DATOS_INFORME if campo not in ('Apertura', 'Cierre'))
+
+
+def test_valor_tras_encabezado_de_otra_seccion():
+    # El valor pertenece al primer encabezado de su tipo aunque haya otro en medio
+    datos = extraer_datos_paginas(["Medio : EFECTIVO\nDETALLE DE EGRESOS\nVal. Ventas : $4,000"])
+    assert datos['Efectivo'] == 4000
+
+    datos = extraer_datos_paginas([
+        "DATOS DE FACTURAS\nV. Bruta : $1,000\nMedio : EFECTIVO\nTotal : $2,000"
+    ])
+    assert (datos['V_Bruta'], datos['Total']) == (1000, 2000)
+
+
+def test_un_total_sirve_a_facturas_y_egresos():
+    datos = extraer_datos_paginas([
+        "DATOS DE FACTURAS\nV. Bruta : $1,000\nDETALLE DE EGRESOS\nTotal : $900"
+    ])
+    assert (datos['Total'], datos['Total_Egresos']) == (900, 900)
+
+
+def test_etiqueta_y_valor_en_paginas_distintas():
+    paginas = ["DATOS DE FACTURAS\nV. Bruta :", "$1,250,000\nTotal : $1,200,000"]
+    datos = extraer_datos_paginas(paginas)
+    assert (datos['V_Bruta'], datos['Total']) == (1250000, 1200000)
+
+
+def test_paginas_equivalen_al_texto_unido():
+    # Cualquier corte entre páginas da lo mismo que unir las páginas con "\n"
+    for corte in range(len(INFORME) + 1):
+        paginas = [INFORME[:corte], INFORME[corte:]]
+        assert extraer_datos_paginas(paginas) == extraer_datos_paginas(["\n".join(paginas)]), corte
+
+
+def test_deja_de_leer_paginas_con_todos_los_campos():
+    leidas = []
+
+    def paginas():
+        for texto in (INFORME, "Total : $1"):
+            leidas.append(texto)
+            yield texto
+
+    assert extraer_datos_paginas(paginas()) == DATOS_INFORME
+    assert leidas == [INFORME]
+
+
+def test_etiqueta_sin_digitos_no_interrumpe_la_extraccion():
+    datos = extraer_datos_paginas([
+        "DETALLE DE EGRESOS\nTotal : ,\nTotal : $50,000\nDiferencia: $,3,500"
+    ])
+    assert (datos['Total_Egresos'], datos['Diferencia']) == (50000, 3500)